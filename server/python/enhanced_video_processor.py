@@ -11,6 +11,8 @@ import tempfile
 import os
 import time
 from youtube_transcript_service import get_youtube_transcript, extract_video_id
+from proxy_session_pool import get_proxy_pool, is_blocked_response, is_network_error
+from transcription_pipeline import transcribe_audio
 
 def run_command(command, timeout=120):
     """Run a command with timeout and error handling"""
@@ -45,29 +47,18 @@ def extract_with_enhanced_ytdlp(video_url, temp_dir):
     Enhanced yt-dlp extraction with IP rotation and multiple bypass methods
     """
     
-    # Free proxy list for IP rotation
-    proxies = [
-        None,  # No proxy first
-        "socks5://127.0.0.1:9050",  # Tor if available
-        "http://proxy.example.com:8080",  # Placeholder for user-provided proxies
-    ]
+    # Healthy proxies from the shared pool, fastest first, each with a fixed user agent
+    proxy_pool = get_proxy_pool()
+    identities = proxy_pool.rotation()
+    total_methods = len(identities) * 4
+    attempt = 0
     
-    # Enhanced commands with IP rotation
-    commands = []
-    
-    for i, proxy in enumerate(proxies):
-        proxy_arg = f'--proxy "{proxy}"' if proxy else ''
-        
-        # Method 1: Basic extraction with rotating user agents
-        user_agents = [
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        ]
-        user_agent = user_agents[i % len(user_agents)]
+    for identity in identities:
+        proxy_arg = f'--proxy "{identity.proxy}"' if identity.proxy else ''
         
-        commands.extend([
-            f'yt-dlp --extract-audio --audio-format mp3 --no-playlist --ignore-errors {proxy_arg} --user-agent "{user_agent}" --output "{temp_dir}/%(title)s.%(ext)s" "{video_url}"',
+        commands = [
+            # Method 1: Basic extraction with the identity's user agent
+            f'yt-dlp --extract-audio --audio-format mp3 --no-playlist --ignore-errors {proxy_arg} --user-agent "{identity.user_agent}" --output "{temp_dir}/%(title)s.%(ext)s" "{video_url}"',
             
             # Method 2: Android client emulation with proxy
             f'yt-dlp --extract-audio --audio-format mp3 --no-playlist --ignore-errors {proxy_arg} --extractor-args "youtube:player_client=android" --output "{temp_dir}/%(title)s.%(ext)s" "{video_url}"',
@@ -77,34 +68,53 @@ def extract_with_enhanced_ytdlp(video_url, temp_dir):
             
             # Method 4: Web client with proxy and rate limiting
             f'yt-dlp --extract-audio --audio-format mp3 --no-playlist --ignore-errors {proxy_arg} --sleep-interval 3 --max-sleep-interval 7 --retries 2 --output "{temp_dir}/%(title)s.%(ext)s" "{video_url}"'
-        ])
-    
-    for i, command in enumerate(commands, 1):
-        print(f"Trying yt-dlp method {i}/4...", file=sys.stderr)
-        result = run_command(command, timeout=180)
+        ]
         
-        if result["success"]:
-            # Check if audio file was created
-            for file in os.listdir(temp_dir):
-                if file.endswith('.mp3'):
-                    return {
-                        "success": True,
-                        "audio_file": os.path.join(temp_dir, file),
-                        "method": f"yt-dlp_method_{i}"
-                    }
+        blocked = False
+        connection_failed = False
+        for command in commands:
+            attempt += 1
+            print(f"Trying yt-dlp method {attempt}/{total_methods} via {identity.label}...", file=sys.stderr)
+            result = run_command(command, timeout=180)
+            
+            if result["success"]:
+                # Check if audio file was created
+                for file in os.listdir(temp_dir):
+                    if file.endswith('.mp3'):
+                        proxy_pool.report_success(identity)
+                        return {
+                            "success": True,
+                            "audio_file": os.path.join(temp_dir, file),
+                            "method": f"yt-dlp_method_{attempt}"
+                        }
+            
+            output = result.get("stderr") or result.get("error", "")
+            if is_blocked_response(message=output):
+                # No point trying other clients from a blocked IP
+                blocked = True
+                break
+            if result.get("timeout") or is_network_error(output):
+                # The proxy itself is failing, move to the next identity
+                connection_failed = True
+                break
+            
+            # Add delay between attempts
+            if attempt < total_methods:
+                time.sleep(3)
         
-        # Add delay between attempts
-        if i < len(commands):
-            time.sleep(3)
+        # Content errors (private, removed, geo-restricted) are not the proxy's fault
+        if blocked or connection_failed:
+            proxy_pool.report_failure(identity, blocked=blocked)
     
     return {
         "success": False,
         "error": "All yt-dlp methods failed"
     }
 
-def process_video_url(video_url):
+def process_video_url(video_url, on_chunk=None):
     """
-    Main video processing function with multiple automated methods
+    Main video processing function with multiple automated methods.
+    on_chunk receives partial transcripts as audio chunks finish.
     """
     result = {
         "url": video_url,
@@ -141,9 +151,38 @@ def process_video_url(video_url):
         if extraction_result["success"]:
             audio_file = extraction_result["audio_file"]
             
-            # Here we would normally call Whisper, but since we're in Python
-            # and the main app uses Node.js Whisper service, we return the audio path
-            # for the Node.js service to handle
+            # Transcribe here in parallel chunks when a speech backend is configured,
+            # while the temp audio file still exists
+            if os.environ.get("TRANSCRIPTION_BACKEND"):
+                try:
+                    transcription = transcribe_audio(audio_file, on_chunk=on_chunk)
+                    error = None if transcription["transcript"] else "Chunked transcription produced no transcript"
+                except Exception as e:
+                    print(f"Chunked transcription failed: {e}", file=sys.stderr)
+                    transcription = None
+                    error = f"Chunked transcription failed: {e}"
+                
+                if not error:
+                    result.update({
+                        "transcript": transcription["transcript"],
+                        "method": f"{extraction_result['method']}+{transcription['method']}",
+                        "duration": transcription["duration"],
+                        "language": transcription["language"],
+                        "segments": transcription["segments"],
+                        "failed_chunks": transcription["failed_chunks"]
+                    })
+                    return result
+                
+                # The audio is deleted with the temp dir on return, so there is nothing
+                # left for a Whisper fallback - report the failure instead
+                result.update({
+                    "error": error,
+                    "method": f"{extraction_result['method']}+chunked_transcription_failed",
+                    "failed_chunks": transcription["failed_chunks"] if transcription else []
+                })
+                return result
+            
+            # Otherwise return the audio path for the Node.js Whisper service to handle
             result.update({
                 "audio_extracted": True,
                 "audio_path": audio_file,
@@ -160,12 +199,17 @@ def process_video_url(video_url):
     return result
 
 def main():
-    if len(sys.argv) != 2:
-        print(json.dumps({"error": "Usage: python enhanced_video_processor.py <video_url>"}))
+    args = [arg for arg in sys.argv[1:] if arg != "--stream"]
+    if len(args) != 1:
+        print(json.dumps({"error": "Usage: python enhanced_video_processor.py <video_url> [--stream]"}))
         sys.exit(1)
     
-    video_url = sys.argv[1]
-    result = process_video_url(video_url)
+    def emit_partial(chunk_result):
+        # One JSON line per finished chunk, the full result is the last line
+        print(json.dumps({"partial": True, **chunk_result}), flush=True)
+    
+    video_url = args[0]
+    result = process_video_url(video_url, on_chunk=emit_partial if "--stream" in sys.argv else None)
     print(json.dumps(result))
 
 if __name__ == "__main__":
@@ -8,39 +8,92 @@ import json
 import sys
 import time
 import random
+import base64
+import contextlib
 import requests
 from datetime import datetime, timedelta
 from pytrends.request import TrendReq
 import pandas as pd
+import numpy as np
+from proxy_session_pool import get_proxy_pool, is_blocked_response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def interest_to_columnar(interest_df, keywords, binary=False):
+    """
+    Convert an interest_over_time DataFrame into a columnar payload: one shared
+    array of epoch-second timestamps plus one int array per keyword.
+    With binary=True the arrays are base64 packed (uint32 LE timestamps,
+    uint8 values since Trends scores are 0-100).
+    """
+    if interest_df is None or interest_df.empty:
+        timestamps = []
+    else:
+        timestamps = [int(ts.timestamp()) for ts in interest_df.index]
+    
+    values = {}
+    for keyword in keywords:
+        if interest_df is not None and keyword in interest_df.columns:
+            values[keyword] = interest_df[keyword].fillna(0).astype(int).tolist()
+        else:
+            values[keyword] = [0] * len(timestamps)
+    
+    partial = False
+    if interest_df is not None and 'isPartial' in interest_df.columns and len(interest_df):
+        partial = bool(interest_df['isPartial'].iloc[-1])
+    
+    if binary:
+        return {
+            'format': 'columnar',
+            'encoding': {'timestamps': 'base64:uint32le', 'values': 'base64:uint8'},
+            'length': len(timestamps),
+            'timestamps': base64.b64encode(np.asarray(timestamps, dtype='<u4').tobytes()).decode('ascii'),
+            'values': {
+                keyword: base64.b64encode(np.clip(series, 0, 255).astype('<u1').tobytes()).decode('ascii')
+                for keyword, series in values.items()
+            },
+            'isPartial': partial
+        }
+    
+    return {
+        'format': 'columnar',
+        'encoding': None,
+        'length': len(timestamps),
+        'timestamps': timestamps,
+        'values': values,
+        'isPartial': partial
+    }
+
+def quiet_stdout():
+    """pytrends prints proxy errors to stdout, which must only ever carry our JSON"""
+    return contextlib.redirect_stdout(sys.stderr)
+
+def dump_json(result, output_path=None):
+    """Serialize compactly with orjson when available, to stdout or a file"""
+    if orjson is not None:
+        payload = orjson.dumps(result)
+    else:
+        payload = json.dumps(result, separators=(',', ':')).encode('utf-8')
+    
+    if output_path:
+        with open(output_path, 'wb') as f:
+            f.write(payload)
+        # Tell the caller where the data went instead of echoing it
+        payload = json.dumps({'output': output_path, 'bytes': len(payload)}).encode('utf-8')
+    
+    sys.stdout.buffer.write(payload + b'\n')
+    sys.stdout.flush()
 
 class GoogleTrendsService:
     def __init__(self):
-        # List of realistic user agents to rotate through
-        self.user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15'
-        ]
-        
-        # Initialize with a custom session for better control
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': random.choice(self.user_agents),
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        })
-        
-        # Initialize pytrends with timeout - no retries parameter due to library compatibility
-        self.pytrends = TrendReq(
-            hl='en-US', 
-            tz=random.randint(300, 500),
-            timeout=(10, 25)
-        )
+        # Shared pool hands out a proxy + user agent pair that stays fixed per identity
+        self.proxy_pool = get_proxy_pool()
+        self.identity = None
+        self.pytrends = None
+        self._connect()
         
         # Track request timing to implement proper delays
         self.last_request_time = 0
@@ -61,17 +114,74 @@ class GoogleTrendsService:
         
         self.last_request_time = time.time()
     
-    def _rotate_user_agent(self):
-        """Rotate user agent to avoid detection"""
-        new_user_agent = random.choice(self.user_agents)
-        self.session.headers.update({'User-Agent': new_user_agent})
+    def _build_pytrends(self, identity):
+        """Create a pytrends client bound to a pool identity's proxy and headers"""
+        # pytrends opens its own requests session per call, so the identity's proxy and
+        # headers go through proxies/requests_args to keep the fingerprint consistent.
+        # No retries parameter due to library compatibility
+        with quiet_stdout():
+            return TrendReq(
+                hl='en-US', 
+                tz=random.randint(300, 500),
+                timeout=(10, 25),
+                proxies=[identity.proxy] if identity.proxy else '',
+                requests_args={'headers': dict(identity.headers)}
+            )
+    
+    def _report_connection_error(self, identity, error):
+        """
+        Put an identity on cooldown for network errors or blocks only - bad keywords
+        or parsing errors are not the proxy's fault. Returns True if it was penalised.
+        """
+        response = getattr(error, 'response', None)
+        blocked = is_blocked_response(getattr(response, 'status_code', None), str(error))
+        if not blocked and not isinstance(error, requests.RequestException):
+            return False
+        
+        self.proxy_pool.report_failure(identity, blocked=blocked)
+        return True
+    
+    def _connect(self):
+        """Bind pytrends to the first identity that can fetch a Google cookie"""
+        last_error = None
+        for identity in self.proxy_pool.rotation():
+            try:
+                self.pytrends = self._build_pytrends(identity)
+                self.identity = identity
+                return
+            except Exception as e:
+                print(f"Could not start Google Trends via {identity.label}: {e}", file=sys.stderr)
+                self._report_connection_error(identity, e)
+                last_error = e
+        raise last_error
+    
+    def _rotate_identity(self, error):
+        """Take the current identity out of rotation and switch pytrends to the next one"""
+        if not self._report_connection_error(self.identity, error):
+            return
+        
+        if self.proxy_pool.acquire() is self.identity:
+            return
+        
+        try:
+            self._connect()
+            print(f"Switching Google Trends identity to {self.identity.label}", file=sys.stderr)
+        except Exception as e:
+            # Keep the current client; the caller's original error still decides the outcome
+            print(f"Could not switch Google Trends identity: {e}", file=sys.stderr)
     
     def _retry_with_backoff(self, func, *args, max_retries=3, **kwargs):
         """Retry a function with exponential backoff"""
         for attempt in range(max_retries):
             try:
-                return func(*args, **kwargs)
+                with quiet_stdout():
+                    result = func(*args, **kwargs)
+                self.proxy_pool.report_success(self.identity)
+                return result
             except Exception as e:
+                # Move to a healthy proxy identity if the failure was the connection's fault
+                self._rotate_identity(e)
+                
                 if attempt == max_retries - 1:
                     raise e
                 
@@ -79,9 +189,6 @@ class GoogleTrendsService:
                 delay = (2 ** attempt) + random.uniform(0, 1)
                 print(f"Attempt {attempt + 1} failed, retrying in {delay:.2f}s: {e}", file=sys.stderr)
                 time.sleep(delay)
-                
-                # Rotate user agent on retry
-                self._rotate_user_agent()
     
     def get_trending_searches(self, country='US', limit=10):
         """Get trending searches for a specific country"""
@@ -126,25 +233,29 @@ class GoogleTrendsService:
             print(f"Error fetching trending searches: {e}", file=sys.stderr)
             return self.get_fallback_trending()
 
+    def _fetch_interest_df(self, keywords, timeframe, geo):
+        """Fetch the raw interest over time DataFrame for keywords"""
+        self._smart_delay()
+        
+        def build_and_fetch():
+            # Build payload
+            self.pytrends.build_payload(
+                kw_list=keywords,
+                cat=0,
+                timeframe=timeframe,
+                geo=geo,
+                gprop=''
+            )
+            # Get interest over time
+            return self.pytrends.interest_over_time()
+        
+        # Use retry mechanism
+        return self._retry_with_backoff(build_and_fetch)
+
     def get_interest_over_time(self, keywords, timeframe='today 3-m', geo='US'):
         """Get interest over time for specific keywords"""
         try:
-            self._smart_delay()
-            
-            def build_and_fetch():
-                # Build payload
-                self.pytrends.build_payload(
-                    kw_list=keywords,
-                    cat=0,
-                    timeframe=timeframe,
-                    geo=geo,
-                    gprop=''
-                )
-                # Get interest over time
-                return self.pytrends.interest_over_time()
-            
-            # Use retry mechanism
-            interest_df = self._retry_with_backoff(build_and_fetch)
+            interest_df = self._fetch_interest_df(keywords, timeframe, geo)
             
             trends = []
             for i, keyword in enumerate(keywords):
@@ -173,6 +284,25 @@ class GoogleTrendsService:
             print(f"Error fetching interest over time: {e}", file=sys.stderr)
             return []
 
+    def get_interest_series(self, keywords, timeframe='today 3-m', geo='US', binary=False):
+        """Get the full interest over time series for keywords as a columnar payload"""
+        try:
+            interest_df = self._fetch_interest_df(keywords, timeframe, geo)
+            series = interest_to_columnar(interest_df, keywords, binary=binary)
+        except Exception as e:
+            print(f"Error fetching interest series: {e}", file=sys.stderr)
+            # Keep the shape but flag the failure so callers can tell it from "no data"
+            series = interest_to_columnar(pd.DataFrame(), keywords, binary=binary)
+            series['error'] = str(e)
+        
+        series.update({
+            'timeframe': timeframe,
+            'geo': geo,
+            'fetchedAt': datetime.now().isoformat(),
+            'source': 'Google Trends - Interest Over Time'
+        })
+        return series
+
     def get_related_queries(self, keyword, geo='US'):
         """Get related queries for a specific keyword"""
         try:
@@ -352,30 +482,70 @@ class GoogleTrendsService:
             }
         ]
 
+def parse_output_flags(argv):
+    """
+    Split --series/--binary/--output PATH flags from positional arguments.
+    Raises ValueError when --output is missing its path.
+    """
+    args = []
+    flags = {'series': False, 'binary': False, 'output': None}
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg == '--series':
+            flags['series'] = True
+        elif arg == '--binary':
+            flags['binary'] = True
+        elif arg == '--output':
+            if i + 1 >= len(argv) or argv[i + 1].startswith('--'):
+                raise ValueError("--output requires a file path")
+            flags['output'] = argv[i + 1]
+            i += 1
+        elif arg.startswith('--output='):
+            flags['output'] = arg.split('=', 1)[1]
+            if not flags['output']:
+                raise ValueError("--output requires a file path")
+        else:
+            args.append(arg)
+        i += 1
+    return args, flags
+
 def main():
     """Main function to handle command line arguments"""
-    if len(sys.argv) < 2:
-        print("Usage: python google_trends_service.py <command> [args]", file=sys.stderr)
+    usage = "Usage: python google_trends_service.py <command> [args] [--series] [--binary] [--output PATH]"
+    try:
+        argv, flags = parse_output_flags(sys.argv)
+    except ValueError as e:
+        print(f"{e}\n{usage}", file=sys.stderr)
+        sys.exit(1)
+    
+    if len(argv) < 2:
+        print(usage, file=sys.stderr)
         sys.exit(1)
     
-    command = sys.argv[1]
-    service = GoogleTrendsService()
+    command = argv[1]
     
     try:
+        service = GoogleTrendsService()
+        
         if command == 'trending':
-            country = sys.argv[2] if len(sys.argv) > 2 else 'US'
-            limit = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+            country = argv[2] if len(argv) > 2 else 'US'
+            limit = int(argv[3]) if len(argv) > 3 else 10
             result = service.get_trending_searches(country, limit)
             
         elif command == 'interest':
-            keywords = sys.argv[2].split(',') if len(sys.argv) > 2 else ['AI marketing']
-            timeframe = sys.argv[3] if len(sys.argv) > 3 else 'today 3-m'
-            geo = sys.argv[4] if len(sys.argv) > 4 else 'US'
-            result = service.get_interest_over_time(keywords, timeframe, geo)
+            keywords = argv[2].split(',') if len(argv) > 2 else ['AI marketing']
+            timeframe = argv[3] if len(argv) > 3 else 'today 3-m'
+            geo = argv[4] if len(argv) > 4 else 'US'
+            if flags['series']:
+                # Full timestamps x keywords matrix instead of per-keyword averages
+                result = service.get_interest_series(keywords, timeframe, geo, binary=flags['binary'])
+            else:
+                result = service.get_interest_over_time(keywords, timeframe, geo)
             
         elif command == 'related':
-            keyword = sys.argv[2] if len(sys.argv) > 2 else 'digital marketing'
-            geo = sys.argv[3] if len(sys.argv) > 3 else 'US'
+            keyword = argv[2] if len(argv) > 2 else 'digital marketing'
+            geo = argv[3] if len(argv) > 3 else 'US'
             result = service.get_related_queries(keyword, geo)
             
         elif command == 'business':
@@ -386,7 +556,7 @@ def main():
             sys.exit(1)
         
         # Output JSON result
-        print(json.dumps(result, indent=2))
+        dump_json(result, flags['output'])
         
     except Exception as e:
         print(f"Error executing command {command}: {e}", file=sys.stderr)
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Proxy Session Pool - Shared proxy rotation and keep-alive sessions
+Loads proxies from config, health-checks them when the saved state is stale
+and keeps blocked or slow proxies out of rotation for Google Trends and video
+extraction. Each CLI call is a fresh process, so probing happens once at
+startup and the results are shared between runs through a small state file
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15'
+]
+
+DEFAULT_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+HEALTH_CHECK_URL = os.environ.get('PROXY_HEALTH_CHECK_URL', 'https://www.google.com/generate_204')
+HEALTH_CHECK_INTERVAL = float(os.environ.get('PROXY_HEALTH_CHECK_INTERVAL', '300'))
+SLOW_THRESHOLD = float(os.environ.get('PROXY_SLOW_THRESHOLD', '5'))
+# Probes run in parallel before the real request, so keep them well inside the callers' budgets
+PROBE_TIMEOUT = float(os.environ.get('PROXY_PROBE_TIMEOUT', '3'))
+BLOCKED_COOLDOWN = 30 * 60
+FAILED_COOLDOWN = 5 * 60
+SLOW_COOLDOWN = 2 * 60
+STATE_FILE = os.environ.get(
+    'PROXY_POOL_STATE_FILE',
+    os.path.join(tempfile.gettempdir(), 'strategist_proxy_pool.json')
+)
+
+# Markers in HTTP errors / yt-dlp output that mean the exit IP is blocked
+BLOCKED_STATUS_CODES = (403, 429)
+BLOCKED_MARKERS = ('HTTP Error 429', 'HTTP Error 403', 'Too Many Requests', "Sign in to confirm you're not a bot")
+
+# Markers in yt-dlp output that mean the proxy or connection itself failed
+NETWORK_ERROR_MARKERS = (
+    'Unable to connect to proxy', 'ProxyError', 'Connection refused', 'Connection reset',
+    'Failed to establish a new connection', 'Network is unreachable', 'timed out'
+)
+
+
+def load_proxy_config():
+    """
+    Load proxy URLs from PROXY_LIST (comma separated) and PROXY_LIST_FILE
+    (one per line, # for comments). Tor is only added when TOR_ENABLED=true.
+    SOCKS proxies (including Tor) need PySocks - `pip install requests[socks]` -
+    and are skipped with a warning when it is missing.
+    """
+    proxies = []
+
+    env_list = os.environ.get('PROXY_LIST', '')
+    proxies.extend(p.strip() for p in env_list.split(',') if p.strip())
+
+    list_file = os.environ.get('PROXY_LIST_FILE')
+    if list_file:
+        try:
+            with open(list_file) as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#'):
+                        proxies.append(line)
+        except OSError as e:
+            print(f"Could not read proxy list file {list_file}: {e}", file=sys.stderr)
+
+    if os.environ.get('TOR_ENABLED') == 'true':
+        proxies.append('socks5://127.0.0.1:9050')
+
+    if not socks_supported():
+        skipped = [p for p in proxies if p.startswith('socks')]
+        if skipped:
+            print(f"Skipping SOCKS proxies, PySocks is not installed: {', '.join(skipped)}", file=sys.stderr)
+        proxies = [p for p in proxies if not p.startswith('socks')]
+
+    # Preserve order, drop duplicates
+    return list(dict.fromkeys(proxies))
+
+
+def socks_supported():
+    try:
+        import socks  # noqa: F401 - provided by requests[socks]
+    except ImportError:
+        return False
+    return True
+
+
+def is_blocked_response(status_code=None, message=''):
+    """Check whether a status code or error output indicates an IP block"""
+    if status_code in BLOCKED_STATUS_CODES:
+        return True
+    return any(marker in (message or '') for marker in BLOCKED_MARKERS)
+
+
+def is_network_error(message=''):
+    """Check whether error output points at the proxy/connection rather than the content"""
+    return any(marker in (message or '') for marker in NETWORK_ERROR_MARKERS)
+
+
+class ProxyIdentity:
+    """A proxy (or direct connection) paired with a fixed user agent and session"""
+
+    def __init__(self, proxy, user_agent):
+        self.proxy = proxy
+        self.user_agent = user_agent
+        self.headers = dict(DEFAULT_HEADERS, **{'User-Agent': user_agent})
+        self.latency = None
+        self.failures = 0
+        self.cooldown_until = 0
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def label(self):
+        return self.proxy or 'direct'
+
+    @property
+    def requests_proxies(self):
+        if not self.proxy:
+            return {}
+        return {'http': self.proxy, 'https': self.proxy}
+
+    def is_available(self, now=None):
+        return (now or time.time()) >= self.cooldown_until
+
+    def get_session(self):
+        """
+        Return the keep-alive session bound to this identity, creating it once.
+        Only used for health probes: pytrends and yt-dlp open their own connections
+        and take the identity's proxy and user agent instead.
+        """
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update(self.headers)
+                session.proxies.update(self.requests_proxies)
+                self._session = session
+            return self._session
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+class ProxySessionPool:
+    """
+    Pool of proxy identities, health-checked at startup when the saved state is stale.
+    The direct connection is always part of the pool so callers never run dry.
+    """
+
+    def __init__(self, proxies=None, state_file=STATE_FILE):
+        if proxies is None:
+            proxies = load_proxy_config()
+
+        self.state_file = state_file
+        self._lock = threading.Lock()
+        self.checked_at = 0
+
+        # Give each proxy a stable user agent so its fingerprint never changes mid-session
+        self.identities = [ProxyIdentity(None, random.choice(USER_AGENTS))]
+        for i, proxy in enumerate(proxies):
+            self.identities.append(ProxyIdentity(proxy, USER_AGENTS[i % len(USER_AGENTS)]))
+
+        self._load_state()
+
+    def _find(self, proxy):
+        for identity in self.identities:
+            if identity.proxy == proxy:
+                return identity
+        return None
+
+    def _load_state(self):
+        """Restore cooldowns from earlier runs, since each CLI call is a fresh process"""
+        if not self.state_file:
+            return
+        try:
+            with open(self.state_file) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        self.checked_at = state.get('checked_at', 0)
+        saved_proxies = state.get('proxies', {})
+        for identity in self.identities:
+            saved = saved_proxies.get(identity.label)
+            if saved:
+                identity.cooldown_until = saved.get('cooldown_until', 0)
+                identity.latency = saved.get('latency')
+                identity.failures = saved.get('failures', 0)
+
+    def _save_state(self):
+        if not self.state_file:
+            return
+        state = {
+            'checked_at': self.checked_at,
+            'proxies': {
+                identity.label: {
+                    'cooldown_until': identity.cooldown_until,
+                    'latency': identity.latency,
+                    'failures': identity.failures
+                }
+                for identity in self.identities
+            }
+        }
+        try:
+            tmp_path = f"{self.state_file}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_file)
+        except OSError as e:
+            print(f"Could not persist proxy pool state: {e}", file=sys.stderr)
+
+    def rotation(self, include_direct=True):
+        """
+        Available identities ordered fastest first (unknown latency last).
+        Falls back to the direct connection if every proxy is cooling down.
+        """
+        now = time.time()
+        with self._lock:
+            available = [
+                identity for identity in self.identities
+                if identity.is_available(now) and (include_direct or identity.proxy)
+            ]
+
+        available.sort(key=lambda identity: (identity.latency is None, identity.latency or 0))
+        if not available and include_direct:
+            available = [self.identities[0]]
+        return available
+
+    def acquire(self):
+        """Return the best available identity"""
+        return self.rotation()[0]
+
+    def report_success(self, identity, latency=None):
+        with self._lock:
+            identity.failures = 0
+            if latency is not None:
+                identity.latency = latency
+                if identity.proxy and latency > SLOW_THRESHOLD:
+                    self._mark_slow(identity, latency)
+            self._save_state()
+
+    def report_failure(self, identity, blocked=False):
+        with self._lock:
+            identity.failures += 1
+            if blocked:
+                cooldown = BLOCKED_COOLDOWN
+            else:
+                cooldown = FAILED_COOLDOWN * min(identity.failures, 4)
+            identity.cooldown_until = time.time() + cooldown
+            # Drop the connection pool so a recovered proxy starts clean
+            identity.close()
+            print(f"Proxy {identity.label} {'blocked' if blocked else 'failed'}, out of rotation for {cooldown}s", file=sys.stderr)
+            self._save_state()
+
+    def _mark_slow(self, identity, latency):
+        identity.cooldown_until = time.time() + SLOW_COOLDOWN
+        print(f"Proxy {identity.label} is slow ({latency:.1f}s), cooling down", file=sys.stderr)
+
+    def report_slow(self, identity, latency):
+        with self._lock:
+            identity.latency = latency
+            self._mark_slow(identity, latency)
+            self._save_state()
+
+    def check_health(self, identity, timeout=PROBE_TIMEOUT):
+        """Probe a single identity and update its rotation status"""
+        start = time.time()
+        try:
+            response = identity.get_session().head(HEALTH_CHECK_URL, timeout=timeout, allow_redirects=False)
+        except requests.Timeout:
+            # Too slow to answer within the probe budget, not necessarily dead
+            self.report_slow(identity, time.time() - start)
+            return False
+        except requests.RequestException as e:
+            print(f"Health check failed for {identity.label}: {e}", file=sys.stderr)
+            self.report_failure(identity)
+            return False
+
+        if response.status_code >= 400:
+            self.report_failure(identity, blocked=is_blocked_response(response.status_code))
+            return False
+
+        self.report_success(identity, time.time() - start)
+        return True
+
+    def refresh_health(self, max_age=HEALTH_CHECK_INTERVAL):
+        """
+        Probe available proxies once, in parallel, unless a previous run already
+        did so within max_age seconds. Runs synchronously so no probe traffic
+        overlaps the real request.
+        """
+        proxies = [identity for identity in self.identities if identity.proxy and identity.is_available()]
+        if not proxies or time.time() - self.checked_at < max_age:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(8, len(proxies))) as executor:
+            list(executor.map(self.check_health, proxies))
+
+        with self._lock:
+            self.checked_at = time.time()
+            self._save_state()
+
+    def close(self):
+        for identity in self.identities:
+            identity.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_proxy_pool():
+    """Return the process-wide pool, probing proxies on first use if the saved state is stale"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProxySessionPool()
+            _pool.refresh_health()
+        return _pool
@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+pytest.importorskip('youtube_transcript_api')
+
+import enhanced_video_processor as processor
+
+VIDEO_URL = 'https://vimeo.com/123456'
+
+
+@pytest.fixture
+def extracted_audio(monkeypatch):
+    monkeypatch.setenv('TRANSCRIPTION_BACKEND', 'stub')
+
+    def extract(video_url, temp_dir):
+        audio_file = os.path.join(temp_dir, 'video.mp3')
+        open(audio_file, 'wb').close()
+        return {'success': True, 'audio_file': audio_file, 'method': 'yt-dlp_method_1'}
+
+    monkeypatch.setattr(processor, 'extract_with_enhanced_ytdlp', extract)
+
+
+def test_chunked_transcript_is_returned(extracted_audio, monkeypatch):
+    partials = []
+
+    def transcribe(audio_file, on_chunk=None):
+        on_chunk({'index': 0, 'text': 'hello'})
+        return {
+            'transcript': 'hello',
+            'method': 'chunked_stub',
+            'duration': 12.0,
+            'language': 'en',
+            'segments': [{'start': 0, 'end': 12.0, 'text': 'hello'}],
+            'failed_chunks': []
+        }
+
+    monkeypatch.setattr(processor, 'transcribe_audio', transcribe)
+    result = processor.process_video_url(VIDEO_URL, on_chunk=partials.append)
+
+    assert result['transcript'] == 'hello'
+    assert result['method'] == 'yt-dlp_method_1+chunked_stub'
+    assert partials == [{'index': 0, 'text': 'hello'}]
+    assert 'requires_whisper' not in result
+
+
+def empty_transcript(audio_file, on_chunk=None):
+    return {'transcript': '', 'failed_chunks': [{'index': 0}]}
+
+
+def missing_ffmpeg(audio_file, on_chunk=None):
+    raise RuntimeError('ffmpeg missing')
+
+
+@pytest.mark.parametrize('transcribe, error', [
+    (empty_transcript, 'Chunked transcription produced no transcript'),
+    (missing_ffmpeg, 'Chunked transcription failed: ffmpeg missing')
+])
+def test_failed_chunked_transcription_reports_error(extracted_audio, monkeypatch, transcribe, error):
+    monkeypatch.setattr(processor, 'transcribe_audio', transcribe)
+
+    result = processor.process_video_url(VIDEO_URL)
+
+    # The temp audio is gone once we return, so no Whisper hand-off
+    assert result['error'] == error
+    assert result['transcript'] is None
+    assert 'audio_path' not in result
+    assert 'requires_whisper' not in result
+    assert 'segments' not in result
@@ -0,0 +1,184 @@
+import base64
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+
+pytest.importorskip('pytrends')
+
+from google_trends_service import GoogleTrendsService, dump_json, interest_to_columnar, parse_output_flags
+
+
+def make_interest_df():
+    return pd.DataFrame(
+        {
+            'ai': [10.0, np.nan, 100.0],
+            'crm': [0.0, 3.0, 7.0],
+            'isPartial': [False, False, True]
+        },
+        index=pd.date_range('2025-01-05', periods=3, freq='W')
+    )
+
+
+def test_columnar_shares_timestamps_and_fills_nan():
+    series = interest_to_columnar(make_interest_df(), ['ai', 'crm'])
+
+    assert series['length'] == 3
+    assert series['timestamps'] == [1736035200, 1736640000, 1737244800]
+    assert series['values'] == {'ai': [10, 0, 100], 'crm': [0, 3, 7]}
+    assert series['isPartial'] is True
+    assert series['encoding'] is None
+
+
+def test_columnar_zero_fills_missing_keyword():
+    series = interest_to_columnar(make_interest_df(), ['ai', 'missing'])
+
+    assert series['values']['missing'] == [0, 0, 0]
+    assert 'isPartial' not in series['values']
+
+
+def test_columnar_empty_frame():
+    series = interest_to_columnar(pd.DataFrame(), ['ai'])
+
+    assert series['length'] == 0
+    assert series['timestamps'] == []
+    assert series['values'] == {'ai': []}
+    assert series['isPartial'] is False
+
+
+def test_columnar_binary_round_trip():
+    plain = interest_to_columnar(make_interest_df(), ['ai', 'crm'])
+    packed = interest_to_columnar(make_interest_df(), ['ai', 'crm'], binary=True)
+
+    assert packed['encoding'] == {'timestamps': 'base64:uint32le', 'values': 'base64:uint8'}
+    timestamps = np.frombuffer(base64.b64decode(packed['timestamps']), dtype='<u4').tolist()
+    assert timestamps == plain['timestamps']
+    for keyword, values in plain['values'].items():
+        decoded = np.frombuffer(base64.b64decode(packed['values'][keyword]), dtype='u1').tolist()
+        assert decoded == values
+
+
+def test_parse_output_flags_splits_flags_from_positionals():
+    args, flags = parse_output_flags(
+        ['script', 'interest', 'ai,crm', '--series', '--binary', '--output', '/tmp/out.json', 'today 1-m']
+    )
+
+    assert args == ['script', 'interest', 'ai,crm', 'today 1-m']
+    assert flags == {'series': True, 'binary': True, 'output': '/tmp/out.json'}
+
+
+def test_parse_output_flags_equals_form():
+    _, flags = parse_output_flags(['script', 'interest', '--output=/tmp/out.json'])
+
+    assert flags['output'] == '/tmp/out.json'
+
+
+@pytest.mark.parametrize('argv', [
+    ['script', 'interest', '--output'],
+    ['script', 'interest', '--output', '--series'],
+    ['script', 'interest', '--output=']
+])
+def test_parse_output_flags_rejects_missing_path(argv):
+    with pytest.raises(ValueError):
+        parse_output_flags(argv)
+
+
+def test_dump_json_writes_payload_to_file(tmp_path, capsys):
+    output_path = tmp_path / 'series.json'
+    series = interest_to_columnar(make_interest_df(), ['ai'], binary=True)
+
+    dump_json(series, str(output_path))
+
+    written = output_path.read_bytes()
+    assert json.loads(written) == series
+    assert json.loads(capsys.readouterr().out) == {'output': str(output_path), 'bytes': len(written)}
+
+
+def test_dump_json_prints_compact_json(capsys):
+    dump_json({'values': [1, 2]})
+
+    assert capsys.readouterr().out == '{"values":[1,2]}\n'
+
+
+def make_series_service(monkeypatch, fetch):
+    # get_interest_series only needs the fetch step, so skip the pool and pytrends setup
+    service = GoogleTrendsService.__new__(GoogleTrendsService)
+    monkeypatch.setattr(service, '_fetch_interest_df', fetch, raising=False)
+    return service
+
+
+def test_interest_series_flags_fetch_errors(monkeypatch):
+    def fetch(keywords, timeframe, geo):
+        raise RuntimeError('quota exceeded')
+
+    series = make_series_service(monkeypatch, fetch).get_interest_series(['ai'], 'today 1-m', 'GB')
+
+    assert series['error'] == 'quota exceeded'
+    assert series['length'] == 0
+    assert series['values'] == {'ai': []}
+    assert (series['timeframe'], series['geo']) == ('today 1-m', 'GB')
+
+
+def test_interest_series_success_has_no_error(monkeypatch):
+    series = make_series_service(monkeypatch, lambda *args: make_interest_df()).get_interest_series(['ai'])
+
+    assert 'error' not in series
+    assert series['values'] == {'ai': [10, 0, 100]}
+
+
+class StubTrendReq:
+    def __init__(self, identity):
+        self.identity = identity
+
+
+@pytest.fixture
+def trends_service(tmp_path, monkeypatch):
+    import google_trends_service
+    from proxy_session_pool import ProxySessionPool
+
+    pool = ProxySessionPool(['http://dead:8080'], state_file=str(tmp_path / 'pool.json'))
+    pool.report_success(pool.identities[1], latency=0.1)
+    monkeypatch.setattr(google_trends_service, 'get_proxy_pool', lambda: pool)
+
+    def build(self, identity):
+        if identity.proxy:
+            print('Proxy error. Changing IP')
+            raise requests.exceptions.ProxyError('Unable to connect to proxy')
+        return StubTrendReq(identity)
+
+    monkeypatch.setattr(google_trends_service.GoogleTrendsService, '_build_pytrends', build)
+    monkeypatch.setattr(google_trends_service.time, 'sleep', lambda seconds: None)
+    return google_trends_service.GoogleTrendsService()
+
+
+def test_service_falls_back_to_direct_when_proxy_is_dead(trends_service):
+    assert trends_service.identity.label == 'direct'
+    assert trends_service.pytrends.identity is trends_service.identity
+    assert not trends_service.proxy_pool.identities[1].is_available()
+
+
+def test_retry_keeps_original_error_when_switching_fails(trends_service, monkeypatch):
+    def fail_connect():
+        raise RuntimeError('rebuild failed')
+
+    monkeypatch.setattr(trends_service, '_connect', fail_connect)
+    trends_service.proxy_pool.identities[1].cooldown_until = 0
+
+    def fetch():
+        raise requests.ConnectionError('connection dropped')
+
+    with pytest.raises(requests.ConnectionError):
+        trends_service._retry_with_backoff(fetch)
+
+
+def test_pytrends_prints_never_reach_stdout(trends_service, capsys):
+    def fetch():
+        print('Proxy error. Changing IP')
+        return 'ok'
+
+    assert trends_service._retry_with_backoff(fetch) == 'ok'
+    captured = capsys.readouterr()
+    assert captured.out == ''
+    assert 'Proxy error' in captured.err
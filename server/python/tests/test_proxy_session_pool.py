@@ -0,0 +1,186 @@
+import time
+
+import pytest
+import requests
+
+import proxy_session_pool
+from proxy_session_pool import (
+    BLOCKED_COOLDOWN,
+    FAILED_COOLDOWN,
+    ProxySessionPool,
+    is_blocked_response,
+    is_network_error,
+    load_proxy_config
+)
+
+
+@pytest.fixture
+def state_file(tmp_path):
+    return str(tmp_path / 'proxy_pool.json')
+
+
+@pytest.fixture
+def proxy_env(monkeypatch):
+    for name in ('PROXY_LIST', 'PROXY_LIST_FILE', 'TOR_ENABLED'):
+        monkeypatch.delenv(name, raising=False)
+    return monkeypatch
+
+
+def labels(identities):
+    return [identity.label for identity in identities]
+
+
+def test_load_proxy_config_merges_env_and_file_without_duplicates(proxy_env, tmp_path):
+    proxy_file = tmp_path / 'proxies.txt'
+    proxy_file.write_text('# office\nhttp://b:8080\n\nhttp://c:8080\n')
+    proxy_env.setenv('PROXY_LIST', ' http://a:8080, http://b:8080 ,')
+    proxy_env.setenv('PROXY_LIST_FILE', str(proxy_file))
+
+    assert load_proxy_config() == ['http://a:8080', 'http://b:8080', 'http://c:8080']
+
+
+def test_load_proxy_config_skips_missing_file(proxy_env, tmp_path):
+    proxy_env.setenv('PROXY_LIST_FILE', str(tmp_path / 'missing.txt'))
+
+    assert load_proxy_config() == []
+
+
+@pytest.mark.parametrize('has_socks, expected', [
+    (True, ['http://a:8080', 'socks5://127.0.0.1:9050']),
+    (False, ['http://a:8080'])
+])
+def test_tor_needs_pysocks(proxy_env, has_socks, expected):
+    proxy_env.setenv('PROXY_LIST', 'http://a:8080')
+    proxy_env.setenv('TOR_ENABLED', 'true')
+    proxy_env.setattr(proxy_session_pool, 'socks_supported', lambda: has_socks)
+
+    assert load_proxy_config() == expected
+
+
+def test_block_and_network_markers():
+    assert is_blocked_response(429)
+    assert is_blocked_response(message="ERROR: Sign in to confirm you're not a bot")
+    assert not is_blocked_response(message='Sign in to confirm your age')
+    assert is_network_error('ProxyError: Unable to connect to proxy')
+    assert not is_network_error('ERROR: Private video')
+
+
+def test_failure_backoff_escalates_across_runs(state_file):
+    pool = ProxySessionPool(['http://a:8080'], state_file=state_file)
+    pool.report_failure(pool.identities[1])
+    first = pool.identities[1].cooldown_until - time.time()
+
+    # A fresh process restores the failure count and backs off further
+    pool = ProxySessionPool(['http://a:8080'], state_file=state_file)
+    assert pool.identities[1].failures == 1
+    pool.report_failure(pool.identities[1])
+    second = pool.identities[1].cooldown_until - time.time()
+
+    assert first == pytest.approx(FAILED_COOLDOWN, abs=5)
+    assert second == pytest.approx(FAILED_COOLDOWN * 2, abs=5)
+
+
+def test_success_resets_failures(state_file):
+    pool = ProxySessionPool(['http://a:8080'], state_file=state_file)
+    pool.report_failure(pool.identities[1])
+    pool.report_success(pool.identities[1])
+
+    assert ProxySessionPool(['http://a:8080'], state_file=state_file).identities[1].failures == 0
+
+
+def test_blocked_proxy_gets_long_cooldown(state_file):
+    pool = ProxySessionPool(['http://a:8080'], state_file=state_file)
+    pool.report_failure(pool.identities[1], blocked=True)
+
+    assert pool.identities[1].cooldown_until - time.time() == pytest.approx(BLOCKED_COOLDOWN, abs=5)
+    assert labels(pool.rotation()) == ['direct']
+
+
+def test_slow_proxy_leaves_rotation_but_direct_does_not(state_file):
+    pool = ProxySessionPool(['http://a:8080'], state_file=state_file)
+    slow = proxy_session_pool.SLOW_THRESHOLD + 1
+    pool.report_success(pool.identities[0], latency=slow)
+    pool.report_success(pool.identities[1], latency=slow)
+
+    assert labels(pool.rotation()) == ['direct']
+
+
+def test_rotation_orders_by_latency_with_unknown_last(state_file):
+    pool = ProxySessionPool(['http://a:8080', 'http://b:8080', 'http://c:8080'], state_file=state_file)
+    pool.report_success(pool.identities[0], latency=1.0)
+    pool.report_success(pool.identities[2], latency=0.2)
+
+    assert labels(pool.rotation()) == ['http://b:8080', 'direct', 'http://a:8080', 'http://c:8080']
+    assert labels(pool.rotation(include_direct=False)) == ['http://b:8080', 'http://a:8080', 'http://c:8080']
+
+
+def test_rotation_falls_back_to_direct_when_everything_cools_down(state_file):
+    pool = ProxySessionPool(['http://a:8080'], state_file=state_file)
+    for identity in pool.identities:
+        pool.report_failure(identity)
+
+    assert labels(pool.rotation()) == ['direct']
+    assert pool.rotation(include_direct=False) == []
+
+
+def test_state_round_trip(state_file):
+    pool = ProxySessionPool(['http://a:8080'], state_file=state_file)
+    pool.report_success(pool.identities[1], latency=0.5)
+    pool.report_failure(pool.identities[1], blocked=True)
+
+    restored = ProxySessionPool(['http://a:8080'], state_file=state_file).identities[1]
+    assert restored.latency == 0.5
+    assert restored.failures == 1
+    assert restored.cooldown_until == pool.identities[1].cooldown_until
+
+
+def test_refresh_health_skips_fresh_state(state_file, monkeypatch):
+    probed = []
+    monkeypatch.setattr(ProxySessionPool, 'check_health', lambda self, identity: probed.append(identity.label))
+
+    pool = ProxySessionPool(['http://a:8080', 'http://b:8080'], state_file=state_file)
+    pool.report_failure(pool.identities[2])
+    pool.refresh_health()
+    assert probed == ['http://a:8080']
+
+    # The next process sees a recent check and does not probe again
+    ProxySessionPool(['http://a:8080', 'http://b:8080'], state_file=state_file).refresh_health()
+    assert probed == ['http://a:8080']
+
+
+def test_refresh_health_probes_stale_state(state_file, monkeypatch):
+    probed = []
+    monkeypatch.setattr(ProxySessionPool, 'check_health', lambda self, identity: probed.append(identity.label))
+
+    ProxySessionPool(['http://a:8080'], state_file=state_file).refresh_health()
+    ProxySessionPool(['http://a:8080'], state_file=state_file).refresh_health(max_age=0)
+
+    assert probed == ['http://a:8080', 'http://a:8080']
+
+
+class FakeSession:
+    def __init__(self, status_code=204, error=None):
+        self.status_code = status_code
+        self.error = error
+
+    def head(self, url, **kwargs):
+        if self.error:
+            raise self.error
+        return type('Response', (), {'status_code': self.status_code})()
+
+
+@pytest.mark.parametrize('session, available, failures', [
+    (FakeSession(204), True, 0),
+    (FakeSession(error=requests.Timeout()), False, 0),
+    (FakeSession(error=requests.ConnectionError()), False, 1),
+    (FakeSession(429), False, 1)
+])
+def test_check_health_outcomes(state_file, session, available, failures):
+    pool = ProxySessionPool(['http://a:8080'], state_file=state_file)
+    identity = pool.identities[1]
+    identity.get_session = lambda: session
+
+    pool.check_health(identity)
+
+    assert identity.is_available() is available
+    assert identity.failures == failures
@@ -0,0 +1,128 @@
+import os
+import random
+import time
+
+import pytest
+
+import transcription_pipeline as pipeline
+from transcription_pipeline import StubBackend, plan_chunks, stitch_chunks, trim_to_owned_range
+
+
+@pytest.fixture
+def fake_audio(monkeypatch):
+    """Replace ffmpeg/ffprobe with a 250s clip that has silences near 60s and 120s"""
+    monkeypatch.setattr(pipeline, 'get_audio_duration', lambda path: 250.0)
+    monkeypatch.setattr(pipeline, 'detect_silences', lambda path: [(59.0, 60.0), (121.0, 122.0)])
+
+    def extract_chunk(audio_path, chunk, output_dir):
+        chunk_path = os.path.join(output_dir, f"chunk_{chunk['index']:04d}.wav")
+        open(chunk_path, 'wb').close()
+        return dict(chunk, path=chunk_path)
+
+    monkeypatch.setattr(pipeline, 'extract_chunk', extract_chunk)
+
+
+class SecondsBackend(StubBackend):
+    """One segment per second of padded chunk, finishing in random order"""
+
+    def transcribe(self, chunk, language=None):
+        time.sleep(random.uniform(0, 0.05))
+        length = int(chunk['end'] - chunk['start'])
+        return {
+            'text': '',
+            'segments': [
+                {'start': i, 'end': i + 1, 'text': f"{chunk['start'] + i:.1f}"}
+                for i in range(length)
+            ],
+            'language': 'en'
+        }
+
+
+class FailingBackend(StubBackend):
+    def transcribe(self, chunk, language=None):
+        if chunk['index'] == 1:
+            raise RuntimeError('backend unavailable')
+        return super().transcribe(chunk, language)
+
+
+def test_plan_chunks_splits_at_silence_nearest_target():
+    chunks = plan_chunks(300, [(55, 56), (118, 121), (200, 200.6), (250, 251)], target=60, max_length=90)
+
+    assert [(c['own_start'], c['own_end']) for c in chunks] == [
+        (0.0, 55.5), (55.5, 119.5), (119.5, 200.3), (200.3, 250.5), (250.5, 300)
+    ]
+
+
+def test_plan_chunks_cuts_at_target_without_silence():
+    chunks = plan_chunks(200, [], target=60, max_length=90)
+
+    assert [c['own_end'] for c in chunks] == [60, 120, 200]
+
+
+def test_plan_chunks_pads_with_overlap_inside_audio():
+    chunks = plan_chunks(200, [], target=60, max_length=90, overlap=1.5)
+
+    assert chunks[0]['start'] == 0.0
+    assert chunks[0]['end'] == 61.5
+    assert chunks[1]['start'] == 58.5
+    assert chunks[-1]['end'] == 200
+
+
+def test_plan_chunks_short_audio_is_one_chunk():
+    chunks = plan_chunks(30, [(10, 11)], target=60, max_length=90)
+
+    assert len(chunks) == 1
+    assert (chunks[0]['start'], chunks[0]['end']) == (0.0, 30)
+
+
+def test_overlap_segments_are_kept_once(fake_audio):
+    result = pipeline.transcribe_audio('audio.mp3', SecondsBackend())
+
+    starts = [segment['start'] for segment in result['segments']]
+    assert result['chunks'] == 4
+    assert starts == sorted(starts)
+    assert len(starts) == len(set(starts))
+    assert len(starts) == 250
+    assert result['failed_chunks'] == []
+
+
+def test_partial_results_streamed_for_every_chunk(fake_audio):
+    partials = []
+    result = pipeline.transcribe_audio('audio.mp3', StubBackend(), on_chunk=partials.append)
+
+    assert sorted(partial['index'] for partial in partials) == list(range(result['chunks']))
+    assert result['method'] == 'chunked_stub'
+
+
+def test_failed_chunks_are_reported(fake_audio):
+    result = pipeline.transcribe_audio('audio.mp3', FailingBackend())
+
+    assert [failure['index'] for failure in result['failed_chunks']] == [1]
+    assert result['failed_chunks'][0]['error'] == 'backend unavailable'
+    assert '[chunk 1 ' not in result['transcript']
+    assert '[chunk 0 ' in result['transcript'] and '[chunk 2 ' in result['transcript']
+
+
+def test_stitch_chunks_orders_by_index():
+    results = [
+        {'index': 2, 'start': 20, 'end': 30, 'text': 'c', 'segments': [{'start': 20, 'end': 30, 'text': 'c'}], 'language': 'en'},
+        {'index': 0, 'start': 0, 'end': 10, 'text': 'a', 'segments': [{'start': 0, 'end': 10, 'text': 'a'}], 'language': 'en'},
+        {'index': 1, 'start': 10, 'end': 20, 'text': '', 'segments': [], 'language': None}
+    ]
+
+    stitched = stitch_chunks(results)
+
+    assert stitched['transcript'] == 'a c'
+    assert [segment['text'] for segment in stitched['segments']] == ['a', 'c']
+    assert stitched['duration'] == 30
+
+
+def test_text_only_backend_does_not_repeat_overlap():
+    # One word per second; adjacent chunks both hear 58-62s
+    first = {'start': 0, 'end': 62, 'own_start': 0, 'own_end': 60}
+    second = {'start': 58, 'end': 120, 'own_start': 60, 'own_end': 120}
+    words = lambda chunk: ' '.join(f'w{t}' for t in range(chunk['start'], chunk['end']))
+
+    stitched = f"{trim_to_owned_range(words(first), first)} {trim_to_owned_range(words(second), second)}".split()
+
+    assert stitched == [f'w{t}' for t in range(120)]
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Transcription Pipeline - Chunked parallel transcription of extracted audio
+Splits audio on silence into overlapping chunks, transcribes them concurrently
+through a pluggable backend and stitches the results back with timestamps
+"""
+
+import os
+import re
+import sys
+import json
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from requests.adapters import HTTPAdapter
+
+TARGET_CHUNK_SECONDS = float(os.environ.get('TRANSCRIPTION_CHUNK_SECONDS', '60'))
+MAX_CHUNK_SECONDS = TARGET_CHUNK_SECONDS * 1.5
+CHUNK_OVERLAP_SECONDS = 1.5
+MAX_WORKERS = int(os.environ.get('TRANSCRIPTION_MAX_WORKERS', '4'))
+
+SILENCE_START_RE = re.compile(r'silence_start:\s*(-?[\d.]+)')
+SILENCE_END_RE = re.compile(r'silence_end:\s*(-?[\d.]+)')
+
+
+class TranscriptionBackend:
+    """
+    Interface for speech backends. transcribe() receives a chunk dict with
+    'path', 'start' and 'end' and returns {'text': str, 'segments': [...]},
+    where segment 'start'/'end' are relative to the chunk.
+    """
+
+    name = 'base'
+
+    def transcribe(self, chunk, language=None):
+        raise NotImplementedError
+
+
+class StubBackend(TranscriptionBackend):
+    """Deterministic local backend for tests and dry runs, no model needed"""
+
+    name = 'stub'
+
+    def transcribe(self, chunk, language=None):
+        length = chunk['end'] - chunk['start']
+        text = f"[chunk {chunk['index']} {chunk['start']:.1f}-{chunk['end']:.1f}]"
+        return {
+            'text': text,
+            'segments': [{'start': 0.0, 'end': length, 'text': text}],
+            'language': language or 'en'
+        }
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """Offline transcription with a local faster-whisper model"""
+
+    name = 'faster_whisper'
+
+    def __init__(self, model_size=None):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise RuntimeError("faster-whisper is not installed")
+
+        model_size = model_size or os.environ.get('WHISPER_MODEL_SIZE', 'base')
+        # One model instance serves every pool worker, so it needs as many
+        # internal workers as the pool, with the CPU cores split between them
+        self.model = WhisperModel(
+            model_size,
+            device='cpu',
+            compute_type='int8',
+            num_workers=MAX_WORKERS,
+            cpu_threads=max(1, (os.cpu_count() or 1) // MAX_WORKERS)
+        )
+
+    def transcribe(self, chunk, language=None):
+        segments, info = self.model.transcribe(chunk['path'], language=language)
+        segments = [
+            {'start': segment.start, 'end': segment.end, 'text': segment.text.strip()}
+            for segment in segments
+        ]
+        return {
+            'text': ' '.join(segment['text'] for segment in segments),
+            'segments': segments,
+            'language': info.language
+        }
+
+
+class OpenAIWhisperBackend(TranscriptionBackend):
+    """OpenAI whisper-1 API, with one keep-alive session shared by all workers"""
+
+    name = 'openai'
+    api_url = 'https://api.openai.com/v1/audio/transcriptions'
+
+    def __init__(self, api_key=None):
+        self.api_key = api_key or os.environ.get('OPENAI_API_KEY')
+        if not self.api_key:
+            raise RuntimeError("OPENAI_API_KEY is not set")
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Authorization': f'Bearer {self.api_key}'})
+
+    def transcribe(self, chunk, language=None):
+        data = {'model': 'whisper-1', 'response_format': 'verbose_json', 'temperature': 0}
+        if language:
+            data['language'] = language
+
+        with open(chunk['path'], 'rb') as f:
+            response = self.session.post(
+                self.api_url,
+                data=data,
+                files={'file': (os.path.basename(chunk['path']), f)},
+                timeout=120
+            )
+        response.raise_for_status()
+        payload = response.json()
+
+        return {
+            'text': payload.get('text', '').strip(),
+            'segments': [
+                {'start': segment['start'], 'end': segment['end'], 'text': segment['text'].strip()}
+                for segment in payload.get('segments', [])
+            ],
+            'language': payload.get('language')
+        }
+
+
+BACKENDS = {
+    StubBackend.name: StubBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+    OpenAIWhisperBackend.name: OpenAIWhisperBackend
+}
+
+
+def get_backend(name=None):
+    """Instantiate a backend by name, defaulting to TRANSCRIPTION_BACKEND"""
+    name = name or os.environ.get('TRANSCRIPTION_BACKEND')
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown transcription backend: {name}")
+    return BACKENDS[name]()
+
+
+def get_audio_duration(audio_path):
+    """Read the audio duration in seconds with ffprobe"""
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+         '-of', 'default=noprint_wrappers=1:nokey=1', audio_path],
+        capture_output=True, text=True, timeout=60
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed: {result.stderr.strip()}")
+    return float(result.stdout.strip())
+
+
+def detect_silences(audio_path, noise_db=-30, min_silence=0.5):
+    """Return (start, end) silence intervals found by ffmpeg's silencedetect filter"""
+    result = subprocess.run(
+        ['ffmpeg', '-hide_banner', '-nostats', '-i', audio_path,
+         '-af', f'silencedetect=noise={noise_db}dB:d={min_silence}', '-f', 'null', '-'],
+        capture_output=True, text=True, timeout=600
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg silencedetect failed: {result.stderr.strip()[-200:]}")
+
+    silences = []
+    start = None
+    for line in result.stderr.splitlines():
+        match = SILENCE_START_RE.search(line)
+        if match:
+            start = max(0.0, float(match.group(1)))
+            continue
+        match = SILENCE_END_RE.search(line)
+        if match and start is not None:
+            silences.append((start, float(match.group(1))))
+            start = None
+    return silences
+
+
+def plan_chunks(duration, silences, target=TARGET_CHUNK_SECONDS, max_length=MAX_CHUNK_SECONDS,
+                overlap=CHUNK_OVERLAP_SECONDS):
+    """
+    Pick split points at the middle of silences closest to every target length,
+    cutting at the target length when no silence is in range. Each chunk 'owns'
+    [own_start, own_end) and is padded by overlap on both sides for extraction.
+    """
+    split_candidates = sorted((start + end) / 2 for start, end in silences)
+    splits = []
+    position = 0.0
+
+    while duration - position > max_length:
+        window = [s for s in split_candidates if position + target / 2 < s <= position + max_length]
+        if window:
+            split = min(window, key=lambda s: abs(s - (position + target)))
+        else:
+            split = position + target
+        splits.append(split)
+        position = split
+
+    boundaries = [0.0] + splits + [duration]
+    chunks = []
+    for index, (own_start, own_end) in enumerate(zip(boundaries, boundaries[1:])):
+        chunks.append({
+            'index': index,
+            'own_start': own_start,
+            'own_end': own_end,
+            'start': max(0.0, own_start - overlap),
+            'end': min(duration, own_end + overlap)
+        })
+    return chunks
+
+
+def extract_chunk(audio_path, chunk, output_dir):
+    """Cut one chunk to 16 kHz mono WAV, which every speech backend accepts"""
+    chunk_path = os.path.join(output_dir, f"chunk_{chunk['index']:04d}.wav")
+    result = subprocess.run(
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y',
+         '-ss', f"{chunk['start']:.3f}", '-t', f"{chunk['end'] - chunk['start']:.3f}",
+         '-i', audio_path, '-ac', '1', '-ar', '16000', chunk_path],
+        capture_output=True, text=True, timeout=120
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg chunk extraction failed: {result.stderr.strip()}")
+    return dict(chunk, path=chunk_path)
+
+
+def trim_to_owned_range(text, chunk):
+    """
+    Drop the words spoken in the overlap padding when a backend gives no
+    segment timings, assuming an even speaking rate across the chunk
+    """
+    words = text.split()
+    length = chunk['end'] - chunk['start']
+    if not words or length <= 0:
+        return ''
+    first = round(len(words) * (chunk['own_start'] - chunk['start']) / length)
+    last = round(len(words) * (chunk['own_end'] - chunk['start']) / length)
+    return ' '.join(words[first:last])
+
+
+def _transcribe_chunk(backend, audio_path, chunk, output_dir, language):
+    chunk = extract_chunk(audio_path, chunk, output_dir)
+    try:
+        transcription = backend.transcribe(chunk, language=language)
+    finally:
+        os.remove(chunk['path'])
+
+    # Shift segments to absolute time and keep only those this chunk owns,
+    # so the overlap padding never produces duplicated text
+    segments = []
+    for segment in transcription.get('segments') or []:
+        start = chunk['start'] + segment['start']
+        end = chunk['start'] + segment['end']
+        midpoint = (start + end) / 2
+        if chunk['own_start'] <= midpoint < chunk['own_end'] or (
+            chunk['own_end'] == chunk['end'] and midpoint >= chunk['own_end']
+        ):
+            segments.append({'start': round(start, 3), 'end': round(end, 3), 'text': segment['text']})
+
+    if not transcription.get('segments') and transcription.get('text'):
+        text = trim_to_owned_range(transcription['text'], chunk)
+        if text:
+            segments = [{'start': chunk['own_start'], 'end': chunk['own_end'], 'text': text}]
+
+    return {
+        'index': chunk['index'],
+        'start': chunk['own_start'],
+        'end': chunk['own_end'],
+        'text': ' '.join(segment['text'] for segment in segments),
+        'segments': segments,
+        'language': transcription.get('language')
+    }
+
+
+def stitch_chunks(chunk_results):
+    """Join chunk results in time order into one transcript with segments"""
+    ordered = sorted(chunk_results, key=lambda result: result['index'])
+    segments = [segment for result in ordered for segment in result['segments']]
+    languages = [result['language'] for result in ordered if result.get('language')]
+    return {
+        'transcript': ' '.join(result['text'] for result in ordered if result['text']),
+        'segments': segments,
+        'language': languages[0] if languages else 'en',
+        'duration': ordered[-1]['end'] if ordered else 0,
+        'chunks': len(ordered)
+    }
+
+
+def transcribe_audio(audio_path, backend=None, language=None, max_workers=MAX_WORKERS, on_chunk=None):
+    """
+    Split audio on silence and transcribe the chunks concurrently.
+    on_chunk is called with each chunk result as soon as it finishes, in
+    completion order, so callers can stream partial transcripts.
+    """
+    backend = backend or get_backend()
+    duration = get_audio_duration(audio_path)
+    chunks = plan_chunks(duration, detect_silences(audio_path))
+    print(f"Transcribing {len(chunks)} chunks of {duration:.1f}s audio with {backend.name}", file=sys.stderr)
+
+    results = []
+    errors = []
+    callback_lock = threading.Lock()
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+            futures = {
+                executor.submit(_transcribe_chunk, backend, audio_path, chunk, output_dir, language): chunk
+                for chunk in chunks
+            }
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Chunk {chunk['index']} failed: {e}", file=sys.stderr)
+                    errors.append({'index': chunk['index'], 'start': chunk['own_start'],
+                                   'end': chunk['own_end'], 'error': str(e)})
+                    continue
+
+                results.append(result)
+                if on_chunk:
+                    with callback_lock:
+                        on_chunk(result)
+
+    stitched = stitch_chunks(results)
+    stitched.update({
+        'duration': duration,
+        'chunks': len(chunks),
+        'failed_chunks': sorted(errors, key=lambda error: error['index']),
+        'method': f'chunked_{backend.name}'
+    })
+    return stitched
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(json.dumps({"error": "Usage: python transcription_pipeline.py <audio_path> [backend] [language]"}))
+        sys.exit(1)
+
+    audio_path = sys.argv[1]
+    backend_name = sys.argv[2] if len(sys.argv) > 2 else None
+    language = sys.argv[3] if len(sys.argv) > 3 else None
+
+    def emit_partial(result):
+        # One JSON line per finished chunk, the stitched result is the last line
+        print(json.dumps({"partial": True, **result}), flush=True)
+
+    try:
+        result = transcribe_audio(audio_path, get_backend(backend_name), language, on_chunk=emit_partial)
+    except Exception as e:
+        print(json.dumps({"error": f"Transcription failed: {e}", "transcript": None}))
+        sys.exit(1)
+
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
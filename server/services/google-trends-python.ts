@@ -1,35 +1,100 @@
-import { exec } from 'child_process';
+import { execFile } from 'child_process';
 import { promisify } from 'util';
+import { readFile, unlink } from 'fs/promises';
 import { TrendingTopic } from './trends';
 import { debugLogger } from './debug-logger';
 
-const execAsync = promisify(exec);
+const execFileAsync = promisify(execFile);
+
+// Payload of `interest --series`, optionally base64 packed with `--binary`
+interface RawInterestSeries {
+  format: 'columnar';
+  encoding: { timestamps: 'base64:uint32le'; values: 'base64:uint8' } | null;
+  length: number;
+  timestamps: number[] | string;
+  values: Record<string, number[] | string>;
+  isPartial: boolean;
+  timeframe: string;
+  geo: string;
+  fetchedAt: string;
+  source: string;
+  error?: string;
+}
+
+export interface InterestSeries {
+  length: number;
+  timestamps: number[];
+  values: Record<string, number[]>;
+  isPartial: boolean;
+  timeframe: string;
+  geo: string;
+  fetchedAt: string;
+  source: string;
+}
+
+export interface InterestSeriesOptions {
+  binary?: boolean;
+  outputPath?: string;
+}
+
+export function decodeInterestSeries(raw: RawInterestSeries): InterestSeries {
+  const { format, encoding, error, ...meta } = raw;
+
+  if (!encoding) {
+    return {
+      ...meta,
+      timestamps: raw.timestamps as number[],
+      values: raw.values as Record<string, number[]>
+    };
+  }
+
+  const timestampBytes = Buffer.from(raw.timestamps as string, 'base64');
+  const timestamps: number[] = [];
+  for (let offset = 0; offset + 4 <= timestampBytes.length; offset += 4) {
+    timestamps.push(timestampBytes.readUInt32LE(offset));
+  }
+
+  const values: Record<string, number[]> = {};
+  for (const [keyword, packed] of Object.entries(raw.values)) {
+    values[keyword] = Array.from(Buffer.from(packed as string, 'base64'));
+  }
+
+  return { ...meta, timestamps, values };
+}
 
 export class GoogleTrendsPythonService {
   private pythonScript = 'server/python/google_trends_service.py';
 
-  async executePythonScript(command: string, args: string[] = []): Promise<TrendingTopic[]> {
-    try {
-      const argString = args.join(' ');
-      const fullCommand = `python3 ${this.pythonScript} ${command} ${argString}`;
-      
-      debugLogger.info(`Executing Python command: ${fullCommand}`);
-      
-      const { stdout, stderr } = await execAsync(fullCommand, {
-        timeout: 30000, // 30 second timeout
-        maxBuffer: 1024 * 1024 // 1MB buffer
-      });
+  // Runs the script with an argv array (no shell) and parses its JSON output
+  private async runPythonScript<T>(command: string, args: string[] = []): Promise<T | null> {
+    const argv = [this.pythonScript, command, ...args];
 
-      if (stderr) {
-        debugLogger.warn(`Python stderr: ${stderr}`);
-      }
+    debugLogger.info(`Executing Python command: python3 ${argv.join(' ')}`);
+
+    const { stdout, stderr } = await execFileAsync('python3', argv, {
+      timeout: 30000, // 30 second timeout
+      maxBuffer: 1024 * 1024 // 1MB buffer
+    });
+
+    if (stderr) {
+      debugLogger.warn(`Python stderr: ${stderr}`);
+    }
+
+    if (!stdout.trim()) {
+      debugLogger.warn('Python script returned empty output');
+      return null;
+    }
 
-      if (!stdout.trim()) {
-        debugLogger.warn('Python script returned empty output');
+    return JSON.parse(stdout) as T;
+  }
+
+  async executePythonScript(command: string, args: string[] = []): Promise<TrendingTopic[]> {
+    try {
+      const result = await this.runPythonScript<TrendingTopic[]>(command, args);
+      if (!result) {
         return [];
       }
 
-      const result = JSON.parse(stdout);
       debugLogger.info(`Python script returned ${result.length} trends`);
       return result;
 
@@ -47,6 +112,49 @@ export class GoogleTrendsPythonService {
     return this.executePythonScript('interest', [keywords.join(','), timeframe, geo]);
   }
 
+  // Full interest series in columnar form: shared timestamps plus one score array per keyword.
+  // Binary packing is on by default; outputPath routes large payloads through a file instead of stdout
+  async getInterestSeries(
+    keywords: string[],
+    timeframe: string = 'today 3-m',
+    geo: string = 'US',
+    options: InterestSeriesOptions = {}
+  ): Promise<InterestSeries | null> {
+    const { binary = true, outputPath } = options;
+    const args = [keywords.join(','), timeframe, geo, '--series'];
+    if (binary) {
+      args.push('--binary');
+    }
+    if (outputPath) {
+      args.push('--output', outputPath);
+    }
+
+    try {
+      let raw = await this.runPythonScript<RawInterestSeries | { output: string }>('interest', args);
+      if (raw && outputPath) {
+        raw = JSON.parse(await readFile(outputPath, 'utf-8'));
+        await unlink(outputPath).catch(() => undefined);
+      }
+
+      if (!raw) {
+        return null;
+      }
+
+      const series = raw as RawInterestSeries;
+      if (series.error) {
+        debugLogger.error(`Python series fetch failed: ${series.error}`);
+        return null;
+      }
+
+      debugLogger.info(`Python script returned ${series.length} points for ${keywords.length} keywords`);
+      return decodeInterestSeries(series);
+
+    } catch (error) {
+      debugLogger.error(`Python series execution failed: ${error.message}`);
+      return null;
+    }
+  }
+
   async getRelatedQueries(keyword: string, geo: string = 'US'): Promise<TrendingTopic[]> {
     return this.executePythonScript('related', [keyword, geo]);
   }
@@ -1,8 +1,16 @@
 import { whisperService } from './whisper';
 import { scraperService } from './scraper';
 import { debugLogger } from './debug-logger';
+import { apiCache } from './cache';
 import fs from 'fs';
 import path from 'path';
+import { EventEmitter } from 'events';
+
+const CHUNKED_TRANSCRIPT_TTL = 24 * 60 * 60 * 1000; // 24 hours
+
+// Background chunked transcription progress:
+// 'partial' (url, chunk), 'complete' (url, result), 'failed' (url, error)
+export const chunkedTranscriptionEvents = new EventEmitter();
 
 export interface VideoTranscriptionResult {
   transcription: string;
@@ -18,6 +26,7 @@ export interface VideoTranscriptionResult {
 }
 
 class VideoTranscriptionService {
+  private chunkedJobs = new Map<string, { controller: AbortController; promise: Promise<any> }>();
   
   // Detect video URLs that can be transcribed
   isVideoUrl(url: string): boolean {
@@ -391,6 +400,11 @@ The system detected this as a video and attempted automatic transcription, but e
 
   // Enhanced video processing with multiple automated methods
   private async processVideoWithEnhancedMethod(url: string): Promise<any> {
+    // With a Python speech backend the processor also transcribes, which takes far longer
+    if (process.env.TRANSCRIPTION_BACKEND) {
+      return this.processVideoWithChunkedTranscription(url);
+    }
+
     const { exec } = await import('child_process');
     const { promisify } = await import('util');
     const execAsync = promisify(exec);
@@ -422,6 +436,125 @@ The system detected this as a video and attempted automatic transcription, but e
     }
   }
 
+  // Chunked transcription outlives the request-level timeouts, so it runs as a background
+  // job per URL: the result lands in apiCache for the next request and partial chunks are
+  // emitted on chunkedTranscriptionEvents as they finish
+  private async processVideoWithChunkedTranscription(url: string): Promise<any> {
+    const cached = await apiCache.get(this.chunkedCacheKey(url));
+    if (cached) {
+      debugLogger.info('Chunked transcription cache hit', { url });
+      return cached;
+    }
+
+    const running = this.chunkedJobs.get(url);
+    if (running) {
+      return running.promise;
+    }
+
+    const controller = new AbortController();
+    const timeout = parseInt(process.env.TRANSCRIPTION_TIMEOUT_MS || '600000', 10);
+    const timer = setTimeout(() => controller.abort(), timeout);
+
+    const promise = this.runChunkedTranscription(url, controller.signal)
+      .then(async (result) => {
+        if (result.transcript) {
+          await apiCache.set(this.chunkedCacheKey(url), result, CHUNKED_TRANSCRIPT_TTL);
+        }
+        chunkedTranscriptionEvents.emit('complete', url, result);
+        return result;
+      })
+      .catch((error) => {
+        chunkedTranscriptionEvents.emit('failed', url, error);
+        throw error;
+      })
+      .finally(() => {
+        clearTimeout(timer);
+        this.chunkedJobs.delete(url);
+      });
+
+    // Callers that give up early must not leave an unhandled rejection behind
+    promise.catch(() => undefined);
+    this.chunkedJobs.set(url, { controller, promise });
+    return promise;
+  }
+
+  // Stops a running chunked transcription job and kills its Python process
+  cancelChunkedTranscription(url: string): boolean {
+    const job = this.chunkedJobs.get(url);
+    if (!job) return false;
+    job.controller.abort();
+    return true;
+  }
+
+  private chunkedCacheKey(url: string): string {
+    return `chunked-transcript:${url}`;
+  }
+
+  // Runs the processor in --stream mode: one JSON line per transcribed chunk, full result last
+  private async runChunkedTranscription(url: string, signal: AbortSignal): Promise<any> {
+    const { spawn } = await import('child_process');
+    const pythonScript = path.join(process.cwd(), 'server/python/enhanced_video_processor.py');
+
+    debugLogger.info('Starting background chunked transcription', { url });
+
+    return new Promise((resolve, reject) => {
+      const child = spawn('python3', [pythonScript, url, '--stream'], { signal, killSignal: 'SIGKILL' });
+      let buffered = '';
+      let stderr = '';
+      let result: any = null;
+
+      const handleLine = (line: string) => {
+        if (!line.trim()) return;
+        try {
+          const message = JSON.parse(line);
+          if (message.partial) {
+            debugLogger.info('Transcribed video chunk', {
+              url,
+              chunk: message.index,
+              start: message.start,
+              end: message.end
+            });
+            chunkedTranscriptionEvents.emit('partial', url, message);
+          } else {
+            result = message;
+          }
+        } catch (parseError) {
+          debugLogger.warn('Unparseable line from video processor', { line: line.slice(0, 200) });
+        }
+      };
+
+      child.stdout.on('data', (data: Buffer) => {
+        buffered += data.toString();
+        const lines = buffered.split('\n');
+        buffered = lines.pop() || '';
+        lines.forEach(handleLine);
+      });
+
+      child.stderr.on('data', (data: Buffer) => {
+        stderr += data.toString();
+      });
+
+      // Fires with an AbortError when the job is cancelled or times out
+      child.on('error', reject);
+
+      child.on('close', (code, signal) => {
+        handleLine(buffered);
+
+        if (stderr) {
+          debugLogger.info('Enhanced video processing info', { stderr: stderr.slice(-2000) });
+        }
+
+        if (!result) {
+          reject(new Error(signal ? `Video processor killed (${signal})` : `Video processor exited with code ${code}`));
+        } else if (result.error && !result.audio_extracted) {
+          reject(new Error(result.error));
+        } else {
+          resolve(result);
+        }
+      });
+    });
+  }
+
   // Build enhanced yt-dlp command with IP rotation and bypass methods
   private async buildEnhancedYtDlpCommand(url: string, outputTemplate: string): Promise<string> {
     const { proxyManager } = await import('./proxy-manager');